@@ -13,12 +13,27 @@ class MongoDB_client:
         self.socket = pymongo.MongoClient(uri, server_api=pymongo.server_api.ServerApi('1'))
         self.check_and_delete_database('bookstore')
         self.database = self.socket['bookstore']
+        self.create_indexes()
 
     def check_and_delete_database(self, database_name):
         if database_name in self.socket.list_database_names():
             self.socket.drop_database(database_name)
             print(f"Database '{database_name}' exists. Deleted.")
 
+    def create_indexes(self):
+        # 索引：仅在初始化时建立一次，覆盖 user / store / order / books 的主要查询路径
+        self.database['user'].create_index([('user_id', pymongo.ASCENDING)], unique=True)
+        self.database['user'].create_index([('user_id', pymongo.ASCENDING), ('token', pymongo.ASCENDING)])
+        self.database['user_store'].create_index([('store_id', pymongo.ASCENDING)], unique=True)
+        self.database['user_store'].create_index([('user_id', pymongo.ASCENDING), ('store_id', pymongo.ASCENDING)])
+        self.database['store'].create_index(
+            [('store_id', pymongo.ASCENDING), ('book_id', pymongo.ASCENDING)], unique=True
+        )
+        self.database['order_history'].create_index([('order_id', pymongo.ASCENDING)], unique=True)
+        # books：title 普通索引供前缀搜索，tags 上的全文索引供 search_book 的 $text 标签查询
+        self.database['books'].create_index([('title', pymongo.ASCENDING)])
+        self.database['books'].create_index([('tags', pymongo.TEXT)], default_language='none')
+
     def get_db_conn(self):
         return self.database
 
@@ -1,31 +1,84 @@
 from be.model import database
-import pymongo
+
+# seller_ids_exist 的默认参数：表示不校验图书（None 本身是合法的 book_id 取值）
+_NO_BOOK = object()
+
 
 class DBConn:
-    # 索引
+    # 存在性校验聚合的超时时间（毫秒）
+    check_timeout_ms: int = 1000
+
+    # 索引在 database.MongoDB_client 初始化时统一建立
     def __init__(self):
         self.conn = database.get_db_conn()
-        self.conn["user"].create_index([("user_id", pymongo.ASCENDING)])
-        self.conn["user_store"].create_index([("user_id", pymongo.ASCENDING), ("store_id", pymongo.ASCENDING)])
-        self.conn["store"].create_index([("book_id", pymongo.ASCENDING), ("store_id", pymongo.ASCENDING)])
+        # 常用集合句柄只在初始化时取一次，避免每次访问都重新构造 Collection
+        self.users = self.conn['user']
+        self.stores = self.conn['store']
+        self.books = self.conn['books']
+        self.orders = self.conn['order_history']
+        self.user_stores = self.conn['user_store']
 
     def user_id_exist(self, user_id):
-        result = self.conn.user.find_one({"user_id": user_id})
+        result = self.users.find_one({"user_id": user_id})
         if result is None:
             return False
         else:
             return True
 
     def book_id_exist(self, store_id, book_id):
-        result = self.conn.store.find_one({"store_id": store_id, "book_id": book_id})
+        result = self.stores.find_one({"store_id": store_id, "book_id": book_id})
         if result is None:
             return False
         else:
             return True
 
+    def books_exist(self, store_id, book_ids) -> set:
+        # 批量校验：一次 distinct 返回该店铺中已存在的 book_id 集合，供调用方做 O(1) 成员判断
+        result = self.stores.distinct(
+            "book_id", {"store_id": store_id, "book_id": {"$in": list(book_ids)}}
+        )
+        return set(result)
+
     def store_id_exist(self, store_id):
-        result = self.conn.user_store.find_one({"store_id": store_id})
+        result = self.user_stores.find_one({"store_id": store_id})
         if result is None:
             return False
         else:
             return True
+
+    def seller_ids_exist(self, user_id, store_id, book_id=_NO_BOOK) -> (bool, bool, bool):
+        # 一次聚合同时校验 user / store / book 是否存在，返回 (user_ok, store_ok, book_ok)
+        # 未传 book_id 时不查询 store 集合，book_ok 恒为 False
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": "user_store",
+                "pipeline": [
+                    {"$match": {"store_id": store_id}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}},
+                ],
+                "as": "stores",
+            }},
+        ]
+        if book_id is not _NO_BOOK:
+            pipeline.append({"$lookup": {
+                "from": "store",
+                "pipeline": [
+                    {"$match": {"store_id": store_id, "book_id": book_id}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}},
+                ],
+                "as": "books",
+            }})
+        pipeline.append({"$project": {
+            "_id": 0,
+            "store_ok": {"$gt": [{"$size": "$stores"}, 0]},
+            "book_ok": {"$gt": [{"$size": {"$ifNull": ["$books", []]}}, 0]},
+        }})
+
+        result = next(self.users.aggregate(pipeline, maxTimeMS=self.check_timeout_ms), None)
+        if result is None:
+            return False, False, False
+        return True, result["store_ok"], result["book_ok"]
@@ -1,4 +1,5 @@
 import pymongo
+from pymongo import InsertOne, UpdateOne
 from be.model import error
 from be.model import db_conn
 
@@ -28,11 +29,12 @@ class Seller(db_conn.DBConn):
         """
         try:
             # 基本校验
-            if not self.user_id_exist(user_id):
+            user_ok, store_ok, book_ok = self.seller_ids_exist(user_id, store_id, book_id)
+            if not user_ok:
                 return error.error_non_exist_user_id(user_id)
-            if not self.store_id_exist(store_id):
+            if not store_ok:
                 return error.error_non_exist_store_id(store_id)
-            if self.book_id_exist(store_id, book_id):
+            if book_ok:
                 return error.error_exist_book_id(book_id)
 
             # 组装并写入文档
@@ -42,11 +44,9 @@ class Seller(db_conn.DBConn):
                 'book_info': book_json_str,  # 字符串形式存储的图书信息（JSON）
                 'stock_level': stock_level,  # 初始库存
             }
-            self.conn['store'].insert_one(book_doc)
+            self.stores.insert_one(book_doc)
         except pymongo.errors.PyMongoError as e:
             return 528, "{}".format(str(e))
-        except BaseException as e:
-            return 530, "{}".format(str(e))
         return 200, "ok"
 
     def add_stock_level(
@@ -57,27 +57,95 @@ class Seller(db_conn.DBConn):
         前置校验：
           - 用户存在
           - 店铺存在
-          - 图书存在
+          - 图书存在（由 update_one 的 matched_count 判断）
         成功：对目标图书的 stock_level 做 $inc 增量更新。
         """
         try:
             # 基本校验
-            if not self.user_id_exist(user_id):
+            user_ok, store_ok, _ = self.seller_ids_exist(user_id, store_id)
+            if not user_ok:
                 return error.error_non_exist_user_id(user_id)
-            if not self.store_id_exist(store_id):
+            if not store_ok:
                 return error.error_non_exist_store_id(store_id)
-            if not self.book_id_exist(store_id, book_id):
-                return error.error_non_exist_book_id(book_id)
 
-            # 增加库存
-            self.conn['store'].update_one(
+            # 增加库存；未匹配到文档说明该店铺下没有这本书
+            result = self.stores.update_one(
                 {'store_id': store_id, 'book_id': book_id},
                 {'$inc': {'stock_level': add_stock_level}},
             )
+            if result.matched_count == 0:
+                return error.error_non_exist_book_id(book_id)
+        except pymongo.errors.PyMongoError as e:
+            return 528, "{}".format(str(e))
+        return 200, "ok"
+
+    def add_books_bulk(self, user_id: str, store_id: str, books: [(str, str, int)]):
+        """
+        批量上架图书：books 为 [(book_id, book_json_str, stock_level)]。
+        前置校验与 add_book 相同，图书重复检查通过一次 books_exist 完成；
+        输入中同一 book_id 出现多次同样视为图书已存在，整批不写入。
+        成功：通过一次 bulk_write 写入全部图书记录。
+        """
+        try:
+            # 基本校验
+            user_ok, store_ok, _ = self.seller_ids_exist(user_id, store_id)
+            if not user_ok:
+                return error.error_non_exist_user_id(user_id)
+            if not store_ok:
+                return error.error_non_exist_store_id(store_id)
+
+            existing = self.books_exist(store_id, [book_id for book_id, _, _ in books])
+            seen = set()
+            for book_id, _, _ in books:
+                if book_id in existing or book_id in seen:
+                    return error.error_exist_book_id(book_id)
+                seen.add(book_id)
+
+            ops = [
+                InsertOne({
+                    'store_id': store_id,
+                    'book_id': book_id,
+                    'book_info': book_json_str,
+                    'stock_level': stock_level,
+                })
+                for book_id, book_json_str, stock_level in books
+            ]
+            if ops:
+                self.stores.bulk_write(ops, ordered=False)
+        except pymongo.errors.PyMongoError as e:
+            return 528, "{}".format(str(e))
+        return 200, "ok"
+
+    def add_stock_level_bulk(self, user_id: str, store_id: str, id_and_count: [(str, int)]):
+        """
+        批量增加库存：id_and_count 为 [(book_id, add_stock_level)]。
+        前置校验与 add_stock_level 相同，图书存在性通过一次 books_exist 完成。
+        成功：通过一次 bulk_write 提交全部 $inc 更新。
+        """
+        try:
+            # 基本校验
+            user_ok, store_ok, _ = self.seller_ids_exist(user_id, store_id)
+            if not user_ok:
+                return error.error_non_exist_user_id(user_id)
+            if not store_ok:
+                return error.error_non_exist_store_id(store_id)
+
+            existing = self.books_exist(store_id, [book_id for book_id, _ in id_and_count])
+            for book_id, _ in id_and_count:
+                if book_id not in existing:
+                    return error.error_non_exist_book_id(book_id)
+
+            ops = [
+                UpdateOne(
+                    {'store_id': store_id, 'book_id': book_id},
+                    {'$inc': {'stock_level': count}},
+                )
+                for book_id, count in id_and_count
+            ]
+            if ops:
+                self.stores.bulk_write(ops, ordered=False)
         except pymongo.errors.PyMongoError as e:
             return 528, "{}".format(str(e))
-        except BaseException as e:
-            return 530, "{}".format(str(e))
         return 200, "ok"
 
     def create_store(self, user_id: str, store_id: str) -> (int, str):
@@ -100,11 +168,9 @@ class Seller(db_conn.DBConn):
                 'store_id': store_id,
                 'user_id': user_id,
             }
-            self.conn['user_store'].insert_one(user_store_doc)
+            self.user_stores.insert_one(user_store_doc)
         except pymongo.errors.PyMongoError as e:
             return 528, "{}".format(str(e))
-        except BaseException as e:
-            return 530, "{}".format(str(e))
         return 200, "ok"
 
     ### 新功能：商家发货 ###
@@ -115,27 +181,28 @@ class Seller(db_conn.DBConn):
           - 用户存在
           - 店铺存在
           - 订单存在且状态为 paid
-        成功：order_history.status -> 'shipped'
+        成功：order_history.status -> 'shipped'（带 status 条件的原子更新）
         """
         try:
             # 基本校验
-            if not self.user_id_exist(user_id):
+            user_ok, store_ok, _ = self.seller_ids_exist(user_id, store_id)
+            if not user_ok:
                 return error.error_non_exist_user_id(user_id)
-            if not self.store_id_exist(store_id):
+            if not store_ok:
                 return error.error_exist_store_id(store_id)  # 注意：此处按原逻辑返回“已存在店铺”错误码
 
-            # 查询订单
-            order = self.conn['order_history'].find_one({'order_id': order_id})
-            if not order:
-                return 400, "Invalid order ID"
-            if order['status'] != 'paid':
-                return 400, "Order is not paid"
-
-            # 更新状态为已发货
-            self.conn['order_history'].update_one(
-                {'order_id': order_id},
+            # 原子地将 paid 订单置为 shipped，避免并发重复发货
+            updated = self.orders.find_one_and_update(
+                {'order_id': order_id, 'status': 'paid'},
                 {'$set': {'status': 'shipped'}},
+                projection={'_id': 1},
             )
+            if updated is None:
+                # 未更新：再查一次以区分“订单不存在”与“订单未支付”
+                order = self.orders.find_one({'order_id': order_id}, {'_id': 1})
+                if not order:
+                    return 400, "Invalid order ID"
+                return 400, "Order is not paid"
         except pymongo.errors.PyMongoError as e:
             return 528, "{}".format(str(e))
         return 200, "ok"
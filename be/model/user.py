@@ -1,7 +1,12 @@
+import re
 import jwt
 import time
+import hashlib
+import secrets
 import logging
+import threading
 import pymongo
+from collections import OrderedDict
 from be.model import error
 from be.model import db_conn
 
@@ -9,28 +14,104 @@ from be.model import db_conn
 def jwt_encode(user_id: str, terminal: str) -> str:
     """
     生成 JWT 字符串。
-    负载包含：user_id、terminal、timestamp。
+    负载包含：user_id、terminal、exp（标准过期时间声明，有效期 User.token_lifetime 秒）。
     注意：这里使用 user_id 作为对称密钥，仅供示例；生产环境应使用独立的服务端密钥。
     """
     encoded = jwt.encode(
-        {"user_id": user_id, "terminal": terminal, "timestamp": time.time()},
+        {"user_id": user_id, "terminal": terminal, "exp": int(time.time()) + User.token_lifetime},
         key=user_id,
         algorithm="HS256",
     )
     # 统一返回 str（pyjwt 在不同版本可能返回 bytes/str）
-    return encoded.encode("utf-8").decode("utf-8")
+    return encoded.decode("utf-8") if isinstance(encoded, bytes) else encoded
 
 
 def jwt_decode(encoded_token, user_id: str):
     """
     解码并验证 JWT。
-    使用 user_id 作为密钥进行 HS256 验签。
+    使用 user_id 作为密钥进行 HS256 验签，并由 PyJWT 校验必需的 exp 声明。
+    过期时抛出 jwt.ExpiredSignatureError。
     返回解码后的 payload（dict）。
     """
-    decoded = jwt.decode(encoded_token, key=user_id, algorithms="HS256")
+    decoded = jwt.decode(encoded_token, key=user_id, algorithms="HS256", options={"require": ["exp"]})
     return decoded
 
 
+# 已验签 token 的进程内 LRU 缓存：摘要 -> 有效期截止时间戳
+# 以 blake2b 摘要为键，避免在缓存中保留原始 token
+_verified_cache_size = 10000
+_verified_tokens = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def _token_digest(user_id: str, token: str) -> bytes:
+    return hashlib.blake2b("{}\0{}".format(user_id, token).encode("utf-8"), digest_size=16).digest()
+
+
+def _verified_until(digest: bytes):
+    """返回缓存中的有效期截止时间；未命中返回 None。"""
+    with _verified_lock:
+        valid_until = _verified_tokens.get(digest)
+        if valid_until is not None:
+            _verified_tokens.move_to_end(digest)
+        return valid_until
+
+
+def _remember_verified(digest: bytes, valid_until: float):
+    with _verified_lock:
+        _verified_tokens[digest] = valid_until
+        _verified_tokens.move_to_end(digest)
+        if len(_verified_tokens) > _verified_cache_size:
+            _verified_tokens.popitem(last=False)
+
+
+def _forget_verified(user_id: str, token: str):
+    with _verified_lock:
+        _verified_tokens.pop(_token_digest(user_id, token), None)
+
+
+# 密码的进程内短期 LRU 缓存：user_id -> (password, 读取时间戳)
+# User 按请求实例化，因此缓存放在模块级；修改密码 / 注销后立即失效
+# 过期条目在读取时删除，总条目数受 _password_cache_size 限制
+# _password_generation 在每次失效时递增：读库前记下代数，写回缓存时若代数已变
+# （期间有修改密码 / 注销），说明读到的可能是旧密码，不写入缓存
+_password_ttl = 5
+_password_cache_size = 10000
+_password_cache = OrderedDict()
+_password_generation = 0
+_password_lock = threading.Lock()
+
+
+def _cached_password(user_id: str):
+    """返回 (未过期的缓存密码或 None, 当前失效代数)。"""
+    with _password_lock:
+        entry = _password_cache.get(user_id)
+        if entry is None:
+            return None, _password_generation
+        if time.time() - entry[1] >= _password_ttl:
+            del _password_cache[user_id]
+            return None, _password_generation
+        _password_cache.move_to_end(user_id)
+        return entry[0], _password_generation
+
+
+def _remember_password(user_id: str, password: str, generation: int):
+    with _password_lock:
+        if generation != _password_generation:
+            return
+        _password_cache[user_id] = (password, time.time())
+        _password_cache.move_to_end(user_id)
+        if len(_password_cache) > _password_cache_size:
+            _password_cache.popitem(last=False)
+
+
+def _forget_password(user_id: str):
+    global _password_generation
+    with _password_lock:
+        _password_generation += 1
+        _password_cache.pop(user_id, None)
+
+
 class User(db_conn.DBConn):
     # 令牌有效期（秒）
     token_lifetime: int = 3600
@@ -45,25 +126,36 @@ class User(db_conn.DBConn):
         仅当：
           1) 明文相等；
           2) JWT 验签通过；
-          3) 含有效 timestamp 且未过期；
+          3) 含 exp 声明且未过期（由 jwt_decode 校验）；
         才判定为有效。
+        验签结果按 token 摘要缓存，命中时只比较有效期，不再重复 HS256 计算；
+        未命中时先不验签读取 exp，已过期的 token 直接判无效，省去一次 HMAC。
         """
         try:
             # 快速失败：明文不一致直接判无效
             if db_token != token:
                 return False
 
-            # 解析并校验签名与时间
-            jwt_text = jwt_decode(encoded_token=token, user_id=user_id)
-            ts = jwt_text.get("timestamp")
-            if ts is None:
+            now = time.time()
+            digest = _token_digest(user_id, token)
+            valid_until = _verified_until(digest)
+            if valid_until is not None:
+                return now < valid_until
+
+            # 先不验签解析负载，过期或缺少 exp 的 token 无需再做 HMAC
+            unverified = jwt.decode(token, options={"verify_signature": False})
+            if unverified.get("exp", 0) < now:
                 return False
 
-            now = time.time()
-            if now - ts <= self.token_lifetime:
-                return True
-        except jwt.exceptions.InvalidSignatureError as e:
-            # 验签失败
+            # 解析并校验签名与过期时间
+            jwt_text = jwt_decode(encoded_token=token, user_id=user_id)
+            _remember_verified(digest, jwt_text["exp"])
+            return True
+        except (jwt.exceptions.ExpiredSignatureError, jwt.exceptions.MissingRequiredClaimError):
+            # 已过期或缺少 exp，直接判无效
+            return False
+        except jwt.exceptions.DecodeError as e:
+            # 格式错误或验签失败（InvalidSignatureError 为 DecodeError 子类）
             logging.error(str(e))
 
         return False
@@ -77,11 +169,11 @@ class User(db_conn.DBConn):
         """
         try:
             # 检查是否已存在同名用户
-            existing_user = self.conn['user'].find_one({"user_id": user_id})
+            existing_user = self.users.find_one({"user_id": user_id})
             if existing_user:
                 return error.error_exist_user_id(user_id)
 
-            terminal = "terminal_{}".format(str(time.time()))
+            terminal = "terminal_{}".format(secrets.token_hex(8))
             token = jwt_encode(user_id, terminal)
             user_doc = {
                 "user_id": user_id,
@@ -90,7 +182,7 @@ class User(db_conn.DBConn):
                 "token": token,
                 "terminal": terminal
             }
-            self.conn['user'].insert_one(user_doc)
+            self.users.insert_one(user_doc)
             return 200, "ok"
         except pymongo.errors.PyMongoError as e:
             return 528, str(e)
@@ -100,7 +192,8 @@ class User(db_conn.DBConn):
         校验用户 token。
         成功返回 200；失败返回鉴权错误。
         """
-        user = self.conn['user'].find_one({'user_id': user_id})
+        # 仅取 token 字段，配合 (user_id, token) 复合索引形成覆盖查询
+        user = self.users.find_one({'user_id': user_id}, {'_id': 0, 'token': 1})
         if user is None:
             return error.error_authorization_fail()
 
@@ -114,13 +207,19 @@ class User(db_conn.DBConn):
     def check_password(self, user_id: str, password: str) -> (int, str):
         """
         校验用户密码（仅取 password 字段，避免多余字段传输）。
+        短时间内对同一用户的重复校验直接使用缓存的密码，不再查询数据库。
         """
         try:
-            user = self.conn['user'].find_one({'user_id': user_id}, {'_id': 0, 'password': 1})
-            if user is None:
-                return error.error_authorization_fail()
+            db_password, generation = _cached_password(user_id)
+            if db_password is None:
+                user = self.users.find_one({'user_id': user_id}, {'_id': 0, 'password': 1})
+                if user is None:
+                    return error.error_authorization_fail()
+
+                db_password = user.get('password')
+                _remember_password(user_id, db_password, generation)
 
-            if user.get('password') != password:
+            if db_password != password:
                 return error.error_authorization_fail()
 
         except pymongo.errors.PyMongoError as e:
@@ -140,7 +239,7 @@ class User(db_conn.DBConn):
 
             # 使用登录时提供的 terminal 生成新 token
             token = jwt_encode(user_id, terminal)
-            result = self.conn['user'].update_one(
+            result = self.users.update_one(
                 {'user_id': user_id},
                 {'$set': {'token': token, 'terminal': terminal}}
             )
@@ -148,8 +247,6 @@ class User(db_conn.DBConn):
                 return error.error_authorization_fail()
         except pymongo.errors.PyMongoError as e:
             return 528, str(e), ""
-        except Exception as e:
-            return 530, str(e), ""
         return 200, "ok", token
 
     def logout(self, user_id: str, token: str):
@@ -164,10 +261,11 @@ class User(db_conn.DBConn):
                 return code, message
 
             # 通过更换 terminal + token 的方式使旧 token 失效
-            terminal = "terminal_{}".format(str(time.time()))
+            _forget_verified(user_id, token)
+            terminal = "terminal_{}".format(secrets.token_hex(8))
             dummy_token = jwt_encode(user_id, terminal)
 
-            result = self.conn['user'].update_one(
+            result = self.users.update_one(
                 {'user_id': user_id},
                 {'$set': {'token': dummy_token, 'terminal': terminal}}
             )
@@ -175,8 +273,6 @@ class User(db_conn.DBConn):
                 return error.error_authorization_fail()
         except pymongo.errors.PyMongoError as e:
             return 528, str(e)
-        except Exception as e:
-            return 530, str(e)
         return 200, "ok"
 
     def unregister(self, user_id: str, password: str) -> (int, str):
@@ -190,14 +286,15 @@ class User(db_conn.DBConn):
             if code != 200:
                 return code, message
 
-            result = self.conn['user'].delete_one({'user_id': user_id})
+            # 写前写后各失效一次，避免并发读把旧密码写回缓存
+            _forget_password(user_id)
+            result = self.users.delete_one({'user_id': user_id})
+            _forget_password(user_id)
             # 期望只删除一条
             if result.deleted_count != 1:
                 return error.error_authorization_fail()
         except pymongo.errors.PyMongoError as e:
             return 528, str(e)
-        except Exception as e:
-            return 530, str(e)
         return 200, "ok"
 
     def change_password(self, user_id: str, old_password: str, new_password: str) -> (int, str):
@@ -211,9 +308,11 @@ class User(db_conn.DBConn):
             if code != 200:
                 return code, message
 
-            terminal = "terminal_{}".format(str(time.time()))
+            terminal = "terminal_{}".format(secrets.token_hex(8))
             token = jwt_encode(user_id, terminal)
-            self.conn['user'].update_one(
+            # 写前写后各失效一次，避免并发读把旧密码写回缓存
+            _forget_password(user_id)
+            self.users.update_one(
                 {'user_id': user_id},
                 {'$set': {
                     'password': new_password,
@@ -221,62 +320,62 @@ class User(db_conn.DBConn):
                     'terminal': terminal,
                 }},
             )
+            _forget_password(user_id)
         except pymongo.errors.PyMongoError as e:
             return 528, str(e)
-        except Exception as e:
-            return 530, str(e)
         return 200, "ok"
 
     ### 新功能：图书搜索 ###
-    def search_book(self, title: str = '', content: str = '', tag: str = '', store_id: str = ''):
+    def search_book(self, title: str = '', content: str = '', tag: str = '', store_id: str = '',
+                    prefix: bool = False):
         """
-        图书搜索（模糊匹配）。
-        查询规则：
-          - title -> books.title  使用 $regex
-          - content -> books.content 使用 $regex
-          - tag -> books.tags 使用 $regex
+        图书搜索。
+        查询规则（多个条件之间为 AND 关系）：
+          - title -> books.title  按字面子串匹配（$regex，关键词已转义）；
+            prefix=True 时改为 ^title 前缀匹配，可走 title 普通索引
+          - content -> books.content 按字面子串匹配（$regex，关键词已转义）
+          - tag -> books.tags 使用 $text 短语检索，由 tags 字段上的全文索引支撑；
+            tags 以换行分隔，每个标签即一个完整词项，故 tag 需与某个标签整体一致
+            （title / content 为无空格的中文，全文索引无法切分，因此不走 $text）
           - 可选：限定在某个 store_id 的在售图书范围内
             · 先从 store 集合查出该店铺所有 book_id
-            · 用 $in 约束 books 集合的 id 字段
+            · 用 $in 约束 books 集合的 _id 字段
         返回：
           - 成功：200, "ok"
           - 未命中：529, "No matching books found."
-          - 异常：528/530
+          - 异常：528
         说明：
-          - 此处使用的字段名 'id' 与常见 'book_id' 命名可能不一致，保持与现有集合结构一致。
-          - 可根据实际数据模型做统一（TODO）。
+          - books 集合以图书 id 作为 _id（见 data/load.py），与 store 集合中的 book_id 对应。
         """
         try:
             query = {}
 
             if title:
-                query['title'] = {"$regex": title}
+                pattern = re.escape(title)
+                query['title'] = {"$regex": "^" + pattern if prefix else pattern}
             if content:
-                query['content'] = {"$regex": content}
+                query['content'] = {"$regex": re.escape(content)}
             if tag:
-                query['tags'] = {"$regex": tag}
+                query['$text'] = {"$search": '"{}"'.format(tag.replace('"', ''))}
 
             # 限定店铺范围（可选）
             if store_id:
-                # 从 store 集合中取出该店铺所有 book_id
-                store_query = {"store_id": store_id}
-                store_result = list(self.conn["store"].find(store_query))
-                if len(store_result) == 0:
+                # 从 store 集合中取出该店铺所有 book_id（distinct 可由 (store_id, book_id) 索引直接返回）
+                book_ids = self.stores.distinct("book_id", {"store_id": store_id})
+                if not book_ids:
                     return error.error_non_exist_store_id(store_id)
 
-                book_ids = [item["book_id"] for item in store_result]
-                # 注意：此处使用 'id' 字段进行过滤，需与 books 集合字段保持一致
-                query['id'] = {"$in": book_ids}
+                # books 集合以图书 id 作为 _id，$in 查询直接走内置 _id 索引
+                query['_id'] = {"$in": book_ids}
 
-            # 执行查询
-            results = list(self.conn["books"].find(query))
+            # 执行查询：只需判断是否命中，取一条 _id 即可
+            cursor = self.books.find(query, {'_id': 1}).limit(1)
+            found = next(cursor, None) is not None
 
         except pymongo.errors.PyMongoError as e:
             return 528, str(e)
-        except BaseException as e:
-            return 530, "{}".format(str(e))
 
-        if not results:
+        if not found:
             return 529, "No matching books found."
         else:
             return 200, "ok"
@@ -42,3 +42,37 @@ def add_stock_level():
     code, message = s.add_stock_level(user_id, store_id, book_id, add_num)
 
     return jsonify({"message": message}), code
+
+
+@bp_seller.route("/add_books_bulk", methods=["POST"])
+def seller_add_books_bulk():
+    user_id: str = request.json.get("user_id")
+    store_id: str = request.json.get("store_id")
+    books: [] = request.json.get("books")
+    book_list = []
+    for book in books:
+        book_info = book.get("book_info")
+        stock_level = book.get("stock_level", 0)
+        book_list.append((book_info.get("id"), json.dumps(book_info), stock_level))
+
+    s = seller.Seller()
+    code, message = s.add_books_bulk(user_id, store_id, book_list)
+
+    return jsonify({"message": message}), code
+
+
+@bp_seller.route("/add_stock_level_bulk", methods=["POST"])
+def add_stock_level_bulk():
+    user_id: str = request.json.get("user_id")
+    store_id: str = request.json.get("store_id")
+    books: [] = request.json.get("books")
+    id_and_count = []
+    for book in books:
+        book_id = book.get("id")
+        count = book.get("add_stock_level", 0)
+        id_and_count.append((book_id, count))
+
+    s = seller.Seller()
+    code, message = s.add_stock_level_bulk(user_id, store_id, id_and_count)
+
+    return jsonify({"message": message}), code
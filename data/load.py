@@ -1,6 +1,81 @@
+import atexit
+import functools
+import itertools
 import os
+import queue
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import pymongo
+from pymongo.write_concern import WriteConcern
+
+# 每批写入 MongoDB 的文档数
+BATCH_SIZE = 1000
+# 并发写入 MongoDB 的线程数
+INSERT_WORKERS = 4
+# 读写线程之间最多缓存的批次数
+QUEUE_SIZE = 4
+
+
+@functools.lru_cache()
+def _get_client():
+    """
+    返回进程内共享的 MongoClient，避免每次导入都重新做拓扑发现与握手。
+    进程退出时统一关闭。
+    """
+    mongo_uri = os.getenv('MONGODB_API')
+    client = pymongo.MongoClient(
+        mongo_uri, server_api=pymongo.server_api.ServerApi('1')
+    )
+    # client = pymongo.MongoClient('mongodb://localhost:27017')
+    atexit.register(client.close)
+    return client
+
+
+def gen_docs(cursor):
+    """
+    逐行遍历 SQLite 游标，生成待写入 MongoDB 的图书文档。
+    """
+    for row in cursor:
+        yield {
+            # 以图书 id 作为 _id：省去服务端生成 ObjectId，并由内置 _id 索引保证唯一
+            '_id': row['id'],
+            'title': row['title'],
+            'author': row['author'],
+            'publisher': row['publisher'],
+            'original_title': row['original_title'],
+            'translator': row['translator'],
+            'pub_year': row['pub_year'],
+            'pages': row['pages'],
+            'price': row['price'],
+            'currency_unit': row['currency_unit'],
+            'binding': row['binding'],
+            'isbn': row['isbn'],
+            'author_intro': row['author_intro'],
+            'book_intro': row['book_intro'],
+            'content': row['content'],
+            'tags': row['tags'],
+            'picture': row['picture'],
+        }
+
+
+def _insert_worker(collection, batches):
+    """
+    消费者线程：从队列取出批次写入 MongoDB，收到 None 时退出。
+    写入出错（含 InvalidDocument、OverflowError 等非 PyMongoError 异常）后继续取空队列
+    （不再写入），保证生产者不会阻塞，收到 None 后再抛出首个异常。
+    """
+    failure = None
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if failure is None:
+            try:
+                collection.insert_many(batch, ordered=False)
+            except Exception as e:
+                failure = e
+    if failure is not None:
+        raise failure
 
 
 def load_books(Use_Large_DB: bool):
@@ -14,48 +89,36 @@ def load_books(Use_Large_DB: bool):
 
     # 建立 SQLite 连接
     with sqlite3.connect(sqlite_path) as sqlite_conn:
+        sqlite_conn.row_factory = sqlite3.Row
         cursor = sqlite_conn.cursor()
 
-        # 连接 MongoDB
-        mongo_uri = os.getenv('MONGODB_API')
-        mongo_client = pymongo.MongoClient(
-            mongo_uri, server_api=pymongo.server_api.ServerApi('1')
-        )
-        # mongo_client = pymongo.MongoClient('mongodb://localhost:27017')
-
-        db = mongo_client['bookstore']
+        # 连接 MongoDB（复用共享客户端）
+        db = _get_client()['bookstore']
 
         # 如果集合已存在则清空，避免重复导入
+        # 只删除文档、保留集合，服务端启动时建立的全文索引等不会随之丢失
         if 'books' in db.list_collection_names():
-            db.drop_collection('books')
+            db['books'].delete_many({})
             print("Succeed to init collection 'books'.")
 
-        # 从 SQLite 读取所有书籍信息
+        # 从 SQLite 流式读取书籍信息，按批写入 MongoDB
+        # SQLite 为数据源，一次性导入无需等待日志落盘
+        books = db.get_collection('books', write_concern=WriteConcern(w=1, j=False))
         cursor.execute("SELECT * FROM book")
-        books_data = cursor.fetchall()
-
-        # 写入 MongoDB
-        for item in books_data:
-            doc = {
-                'id': item[0],
-                'title': item[1],
-                'author': item[2],
-                'publisher': item[3],
-                'original_title': item[4],
-                'translator': item[5],
-                'pub_year': item[6],
-                'pages': item[7],
-                'price': item[8],
-                'currency_unit': item[9],
-                'binding': item[10],
-                'isbn': item[11],
-                'author_intro': item[12],
-                'book_intro': item[13],
-                'content': item[14],
-                'tags': item[15],
-                'picture': item[16],
-            }
-            db['books'].insert_one(doc)
-
-        # 关闭连接
-        mongo_client.close()
+        docs = gen_docs(cursor)
+
+        # 当前线程读取 SQLite（连接不可跨线程），多个线程并发写入 MongoDB
+        batches = queue.Queue(maxsize=QUEUE_SIZE)
+        with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as executor:
+            futures = [executor.submit(_insert_worker, books, batches) for _ in range(INSERT_WORKERS)]
+            try:
+                while True:
+                    batch = list(itertools.islice(docs, BATCH_SIZE))
+                    if not batch:
+                        break
+                    batches.put(batch)
+            finally:
+                for _ in futures:
+                    batches.put(None)
+            for future in futures:
+                future.result()
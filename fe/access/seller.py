@@ -52,3 +52,33 @@ class Seller:
         headers = {"token": self.token}
         r = requests.post(url, headers=headers, json=json)
         return r.status_code
+
+    def add_books_bulk(self, store_id: str, books: [(book.Book, int)]) -> int:
+        json = {
+            "user_id": self.seller_id,
+            "store_id": store_id,
+            "books": [
+                {"book_info": book_info.__dict__, "stock_level": stock_level}
+                for book_info, stock_level in books
+            ],
+        }
+        url = urljoin(self.url_prefix, "add_books_bulk")
+        headers = {"token": self.token}
+        r = requests.post(url, headers=headers, json=json)
+        return r.status_code
+
+    def add_stock_level_bulk(
+        self, seller_id: str, store_id: str, id_and_count: [(str, int)]
+    ) -> int:
+        json = {
+            "user_id": seller_id,
+            "store_id": store_id,
+            "books": [
+                {"id": book_id, "add_stock_level": count}
+                for book_id, count in id_and_count
+            ],
+        }
+        url = urljoin(self.url_prefix, "add_stock_level_bulk")
+        headers = {"token": self.token}
+        r = requests.post(url, headers=headers, json=json)
+        return r.status_code
@@ -0,0 +1,53 @@
+import pytest
+
+from fe import conf
+from fe.access.new_seller import register_new_seller
+from fe.access import book
+import uuid
+
+
+class TestAddBooksBulk:
+    @pytest.fixture(autouse=True)
+    def pre_run_initialization(self):
+        # do before test
+        self.seller_id = "test_add_books_bulk_seller_id_{}".format(str(uuid.uuid1()))
+        self.store_id = "test_add_books_bulk_store_id_{}".format(str(uuid.uuid1()))
+        self.password = self.seller_id
+        self.seller = register_new_seller(self.seller_id, self.password)
+
+        code = self.seller.create_store(self.store_id)
+        assert code == 200
+        book_db = book.BookDB(conf.Use_Large_DB)
+        self.books = book_db.get_book_info(0, 5)
+
+        yield
+        # do after test
+
+    def test_ok(self):
+        code = self.seller.add_books_bulk(self.store_id, [(b, 0) for b in self.books])
+        assert code == 200
+
+    def test_error_non_exist_store_id(self):
+        code = self.seller.add_books_bulk(
+            self.store_id + "x", [(b, 0) for b in self.books]
+        )
+        assert code != 200
+
+    def test_error_non_exist_user_id(self):
+        self.seller.seller_id = self.seller.seller_id + "_x"
+        code = self.seller.add_books_bulk(self.store_id, [(b, 0) for b in self.books])
+        assert code != 200
+
+    def test_error_exist_book_id(self):
+        code = self.seller.add_book(self.store_id, 0, self.books[0])
+        assert code == 200
+        code = self.seller.add_books_bulk(self.store_id, [(b, 0) for b in self.books])
+        assert code != 200
+
+    def test_error_duplicate_book_id(self):
+        books = [(b, 0) for b in self.books] + [(self.books[0], 0)]
+        code = self.seller.add_books_bulk(self.store_id, books)
+        assert code != 200
+        # nothing from the rejected batch was written
+        code = self.seller.add_books_bulk(self.store_id, [(b, 0) for b in self.books])
+        assert code == 200
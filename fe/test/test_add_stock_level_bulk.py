@@ -0,0 +1,47 @@
+import pytest
+
+from fe import conf
+from fe.access.new_seller import register_new_seller
+from fe.access import book
+import uuid
+
+
+class TestAddStockLevelBulk:
+    @pytest.fixture(autouse=True)
+    def pre_run_initialization(self):
+        self.user_id = "test_add_stock_level_bulk_user_{}".format(str(uuid.uuid1()))
+        self.store_id = "test_add_stock_level_bulk_store_{}".format(str(uuid.uuid1()))
+        self.password = self.user_id
+        self.seller = register_new_seller(self.user_id, self.password)
+
+        code = self.seller.create_store(self.store_id)
+        assert code == 200
+        book_db = book.BookDB(conf.Use_Large_DB)
+        self.books = book_db.get_book_info(0, 5)
+        code = self.seller.add_books_bulk(self.store_id, [(b, 0) for b in self.books])
+        assert code == 200
+        yield
+
+    def test_error_user_id(self):
+        code = self.seller.add_stock_level_bulk(
+            self.user_id + "_x", self.store_id, [(b.id, 10) for b in self.books]
+        )
+        assert code != 200
+
+    def test_error_store_id(self):
+        code = self.seller.add_stock_level_bulk(
+            self.user_id, self.store_id + "_x", [(b.id, 10) for b in self.books]
+        )
+        assert code != 200
+
+    def test_error_book_id(self):
+        id_and_count = [(b.id, 10) for b in self.books]
+        id_and_count.append((self.books[0].id + "_x", 10))
+        code = self.seller.add_stock_level_bulk(self.user_id, self.store_id, id_and_count)
+        assert code != 200
+
+    def test_ok(self):
+        code = self.seller.add_stock_level_bulk(
+            self.user_id, self.store_id, [(b.id, 10) for b in self.books]
+        )
+        assert code == 200
@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+
+from be.model import user
+from fe.access import auth
+from fe import conf
+
+
+class TestPasswordCache:
+    @pytest.fixture(autouse=True)
+    def pre_run_initialization(self):
+        self.auth = auth.Auth(conf.URL)
+        # register a user
+        self.user_id = "test_password_cache_{}".format(str(uuid.uuid1()))
+        self.old_password = "old_password_" + self.user_id
+        self.new_password = "new_password_" + self.user_id
+        self.terminal = "terminal_" + self.user_id
+
+        assert self.auth.register(self.user_id, self.old_password) == 200
+        yield
+
+    def test_old_password_rejected_after_change(self):
+        # 登录一次，使旧密码进入缓存
+        code, token = self.auth.login(self.user_id, self.old_password, self.terminal)
+        assert code == 200
+
+        code = self.auth.password(self.user_id, self.old_password, self.new_password)
+        assert code == 200
+
+        code, token = self.auth.login(self.user_id, self.old_password, self.terminal)
+        assert code != 200
+
+        code, token = self.auth.login(self.user_id, self.new_password, self.terminal)
+        assert code == 200
+
+    def test_stale_read_not_cached_after_change(self):
+        # 模拟并发：某次校验在修改密码前读到了旧密码，在修改完成后才写回缓存
+        db_password, generation = user._cached_password(self.user_id)
+        assert db_password is None
+
+        code = self.auth.password(self.user_id, self.old_password, self.new_password)
+        assert code == 200
+
+        user._remember_password(self.user_id, self.old_password, generation)
+
+        code, token = self.auth.login(self.user_id, self.old_password, self.terminal)
+        assert code != 200
+
+        code, token = self.auth.login(self.user_id, self.new_password, self.terminal)
+        assert code == 200
+
+    def test_password_rejected_after_unregister(self):
+        code, token = self.auth.login(self.user_id, self.old_password, self.terminal)
+        assert code == 200
+
+        code = self.auth.unregister(self.user_id, self.old_password)
+        assert code == 200
+
+        code, token = self.auth.login(self.user_id, self.old_password, self.terminal)
+        assert code != 200
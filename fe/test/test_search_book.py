@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from be.model import user
+
+
+class TestSearchBook:
+    @pytest.fixture(autouse=True)
+    def pre_run_initialization(self):
+        # 直接调用后端模型，向 books / store 集合写入带唯一后缀的测试数据
+        self.user = user.User()
+        suffix = str(uuid.uuid1())
+        self.store_id = "test_search_book_store_{}".format(suffix)
+        self.book_a = {
+            "_id": "test_search_book_a_{}".format(suffix),
+            "title": "美丽心灵{}".format(suffix),
+            "content": "第一章，天才与疯子{}。".format(suffix),
+            "tags": "传记{0}\n数学{0}\n".format(suffix),
+        }
+        self.book_b = {
+            "_id": "test_search_book_b_{}".format(suffix),
+            "title": "三毛流浪记全集{}".format(suffix),
+            "content": "三毛在上海街头{}。".format(suffix),
+            "tags": "漫画{0}\n".format(suffix),
+        }
+        self.suffix = suffix
+        self.user.books.insert_many([self.book_a, self.book_b])
+        # 店铺中只上架 book_a
+        self.user.stores.insert_one(
+            {"store_id": self.store_id, "book_id": self.book_a["_id"], "book_info": "{}", "stock_level": 1}
+        )
+        yield
+        self.user.books.delete_many({"_id": {"$in": [self.book_a["_id"], self.book_b["_id"]]}})
+        self.user.stores.delete_many({"store_id": self.store_id})
+
+    def test_title_ok(self):
+        # 中文标题中间的子串即可命中
+        code, _ = self.user.search_book(title="心灵" + self.suffix)
+        assert code == 200
+        code, _ = self.user.search_book(title="三毛流浪", prefix=True)
+        assert code == 200
+
+    def test_tag_ok(self):
+        code, _ = self.user.search_book(tag="数学" + self.suffix)
+        assert code == 200
+
+    def test_and_terms(self):
+        code, _ = self.user.search_book(title="心灵" + self.suffix, content="天才")
+        assert code == 200
+        # title 命中 book_a，content 只在 book_b 中出现，AND 后无结果
+        code, _ = self.user.search_book(title="心灵" + self.suffix, content="三毛在上海街头" + self.suffix)
+        assert code == 529
+        code, _ = self.user.search_book(title="心灵" + self.suffix, tag="漫画" + self.suffix)
+        assert code == 529
+
+    def test_store_id(self):
+        code, _ = self.user.search_book(title="心灵" + self.suffix, store_id=self.store_id)
+        assert code == 200
+        # book_b 不在该店铺中
+        code, _ = self.user.search_book(title="三毛流浪记全集" + self.suffix, store_id=self.store_id)
+        assert code == 529
+
+    def test_error_no_match(self):
+        code, message = self.user.search_book(title="不存在的书" + self.suffix)
+        assert code == 529
+        code, message = self.user.search_book(tag="不存在的标签" + self.suffix)
+        assert code == 529
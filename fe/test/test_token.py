@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from be.model.user import User
+from fe.access import auth
+from fe import conf
+
+
+class TestToken:
+    @pytest.fixture(autouse=True)
+    def pre_run_initialization(self):
+        self.auth = auth.Auth(conf.URL)
+        # register a user
+        self.user_id = "test_token_{}".format(time.time())
+        self.password = "password_" + self.user_id
+        self.terminal = "terminal_" + self.user_id
+        assert self.auth.register(self.user_id, self.password) == 200
+        self.token_lifetime = User.token_lifetime
+        yield
+        User.token_lifetime = self.token_lifetime
+
+    def test_error_expired_token(self):
+        # 后端与测试在同一进程中运行，调低有效期即可签发已过期的 token
+        User.token_lifetime = -10
+        code, token = self.auth.login(self.user_id, self.password, self.terminal)
+        assert code == 200
+
+        code = self.auth.logout(self.user_id, token)
+        assert code == 401
+
+    def test_error_token_after_logout(self):
+        code, token = self.auth.login(self.user_id, self.password, self.terminal)
+        assert code == 200
+
+        code = self.auth.logout(self.user_id, token)
+        assert code == 200
+
+        # 旧 token 已失效（包括验签缓存中的记录）
+        code = self.auth.logout(self.user_id, token)
+        assert code == 401
+
+    def test_error_token_after_password_change(self):
+        code, token = self.auth.login(self.user_id, self.password, self.terminal)
+        assert code == 200
+
+        code = self.auth.password(self.user_id, self.password, self.password + "_x")
+        assert code == 200
+
+        code = self.auth.logout(self.user_id, token)
+        assert code == 401